@@ -1,12 +1,31 @@
+import importlib
 from os.path import dirname, basename, isfile
-from .person import Person
-from .objects import Institution, Experience, Education, Contact
-from .company import Company
-from .jobs import Job
-from .job_search import JobSearch
 
 __version__ = "2.11.5"
 
+# the scrapers pull in selenium, so they're only imported on first access
+_exports = {
+    "Person": ".person",
+    "Institution": ".objects",
+    "Experience": ".objects",
+    "Education": ".objects",
+    "Contact": ".objects",
+    "PersonData": ".objects",
+    "Company": ".company",
+    "Job": ".jobs",
+    "JobSearch": ".job_search",
+}
+
+def __getattr__(name):
+    if name in _exports:
+        value = getattr(importlib.import_module(_exports[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_exports))
+
 import glob
 modules = glob.glob(dirname(__file__)+"/*.py")
 __all__ = [ basename(f)[:-3] for f in modules if isfile(f) and not f.endswith('__init__.py')]
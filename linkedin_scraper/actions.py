@@ -1,4 +1,5 @@
 import getpass
+import os
 from . import constants as c
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.common.by import By
@@ -13,13 +14,23 @@ def page_has_loaded(driver):
     page_state = driver.execute_script('return document.readyState;')
     return page_state == 'complete'
 
-def login(driver, email=None, password=None, cookie = None, timeout=10):
-    if cookie is not None:
-        return _login_with_cookie(driver, cookie)
-  
+def get_credentials(email=None, password=None):
+    if not email or not password:
+        email = email or os.environ.get("LINKEDIN_USER")
+        password = password or os.environ.get("LINKEDIN_PASSWORD")
+
     if not email or not password:
         email, password = __prompt_email_password()
+    return email, password
+
+def login(driver, email=None, password=None, cookie = None, timeout=10, verify=True):
+    if cookie is not None:
+        return _login_with_cookie(driver, cookie, verify=verify, timeout=timeout)
   
+    email, password = get_credentials(email, password)
+  
+    # whatever session the driver had is replaced by this login
+    driver._linkedin_signed_in = False
     driver.get("https://www.linkedin.com/login")
     element = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "username")))
   
@@ -30,16 +41,36 @@ def login(driver, email=None, password=None, cookie = None, timeout=10):
     password_elem.send_keys(password)
     password_elem.submit()
   
-    if driver.current_url == 'https://www.linkedin.com/checkpoint/lg/login-submit':
+    if driver.current_url.startswith('https://www.linkedin.com/checkpoint/lg/login-submit'):
         remember = driver.find_element(By.ID,c.REMEMBER_PROMPT)
         if remember:
             remember.submit()
   
     element = WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CLASS_NAME, c.VERIFY_LOGIN_ID)))
+    driver._linkedin_signed_in = True
   
-def _login_with_cookie(driver, cookie):
-    driver.get("https://www.linkedin.com/login")
+def _login_with_cookie(driver, cookie, verify=True, timeout=10):
+    # cookies can only be read/set on the linkedin domain, but there's no need
+    # to load the login page again if the driver is already there
+    if not driver.current_url.startswith("https://www.linkedin.com"):
+        driver.get("https://www.linkedin.com/login")
+
+    # the same cookie value may have expired since, so it's only skipped
+    # once this session has been seen signed in with it
+    existing = driver.get_cookie("li_at")
+    if existing and existing.get("value") == cookie and getattr(driver, "_linkedin_signed_in", False):
+        return
+
+    # the cookie hasn't been checked yet, so let is_signed_in look again
+    driver._linkedin_signed_in = False
     driver.add_cookie({
       "name": "li_at",
       "value": cookie
     })
+
+    if verify:
+        # the cookie only applies from the next page load, and an expired one
+        # lands back on the login page instead of the feed
+        driver.get("https://www.linkedin.com/feed/")
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CLASS_NAME, c.VERIFY_LOGIN_ID)))
+        driver._linkedin_signed_in = True
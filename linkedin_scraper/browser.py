@@ -0,0 +1,117 @@
+import atexit
+import os
+import queue
+import threading
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+# drivers that scrapers created for themselves and have finished with; the next
+# scraper without a driver takes one of these instead of starting chrome again
+_pool = queue.Queue()
+_created = []
+_created_lock = threading.Lock()
+
+# flags every driver is started with. /dev/shm is tiny in most containers and
+# chrome crashes once it fills up, and a fixed window size keeps linkedin's
+# responsive layout (and so the selectors) the same headless or not
+DEFAULT_ARGS = [
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-blink-features=AutomationControlled",
+    "--window-size=1280,1024",
+]
+
+# subresources none of the scrapers read: media, fonts and linkedin's own
+# tracking beacons, plus the images that imagesEnabled=false already hides
+BLOCKED_URLS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.svg",
+    "*.woff", "*.woff2", "*.ttf",
+    "*.mp4", "*.webm",
+    "*/li/track*", "*doubleclick.net*", "*px.ads.linkedin.com*",
+]
+
+
+def _blocks_images(headless, block_images):
+    # images are never read by the scrapers, but a visible browser may still
+    # be used to log in by hand, where a captcha needs them
+    return headless if block_images is None else block_images
+
+
+def chrome_options(headless=False, block_images=None, user_data_dir=None, extra_args=None):
+    options = webdriver.ChromeOptions()
+    for arg in DEFAULT_ARGS + list(extra_args or []):
+        options.add_argument(arg)
+    # a persistent profile keeps the login cookies between runs, so a driver
+    # built on it starts out signed in
+    if user_data_dir:
+        options.add_argument(f"--user-data-dir={os.path.expanduser(user_data_dir)}")
+    if _blocks_images(headless, block_images):
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+    return options
+
+
+def create_driver(headless=False, block_images=None, user_data_dir=None, extra_args=None):
+    block_images = _blocks_images(headless, block_images)
+    options = chrome_options(
+        headless=headless,
+        block_images=block_images,
+        user_data_dir=user_data_dir,
+        extra_args=extra_args,
+    )
+    if os.getenv("CHROMEDRIVER") == None:
+        driver_path = os.path.join(os.path.dirname(__file__), "drivers/chromedriver")
+    else:
+        driver_path = os.getenv("CHROMEDRIVER")
+
+    try:
+        driver = webdriver.Chrome(service=Service(driver_path), options=options)
+    except:
+        driver = webdriver.Chrome(options=options)
+
+    if block_images:
+        block_heavy_resources(driver)
+    return driver
+
+
+def block_heavy_resources(driver, urls=BLOCKED_URLS):
+    # the requests are cancelled before they leave the browser, so a page
+    # load only waits on the document and the scripts that render it
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(urls)})
+
+
+def get_driver():
+    try:
+        return _pool.get_nowait()
+    except queue.Empty:
+        pass
+    driver = create_driver()
+    with _created_lock:
+        _created.append(driver)
+    return driver
+
+
+def release_driver(driver):
+    # a fresh browser wouldn't be logged in either, so don't hand the next
+    # scraper this one's session
+    driver.delete_all_cookies()
+    driver._linkedin_signed_in = False
+    _pool.put(driver)
+
+
+@atexit.register
+def quit_drivers():
+    with _created_lock:
+        drivers, _created[:] = list(_created), []
+    while not _pool.empty():
+        _pool.get_nowait()
+    for driver in drivers:
+        try:
+            driver.quit()
+        except:
+            pass
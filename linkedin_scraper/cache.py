@@ -0,0 +1,66 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "linkedin_scraper", "profiles.sqlite")
+DEFAULT_TTL = 24 * 60 * 60
+
+
+def normalize_url(url):
+    return url.split("?")[0].rstrip("/").lower()
+
+
+class ProfileCache:
+    # scraped objects pickled into sqlite, keyed by their normalized url
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS profiles (url TEXT PRIMARY KEY, scraped_at REAL NOT NULL, data BLOB NOT NULL)"
+            )
+
+    def get(self, url, ttl=DEFAULT_TTL):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT scraped_at, data FROM profiles WHERE url = ?", (normalize_url(url),)
+            ).fetchone()
+        if row is None:
+            return None
+        scraped_at, data = row
+        if ttl is not None and time.time() - scraped_at > ttl:
+            return None
+        return pickle.loads(data)
+
+    def set(self, url, value):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO profiles (url, scraped_at, data) VALUES (?, ?, ?)",
+                (normalize_url(url), time.time(), data),
+            )
+
+    def delete(self, url):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM profiles WHERE url = ?", (normalize_url(url),))
+
+    def close(self):
+        self._connection.close()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def default_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ProfileCache()
+        return _default_cache
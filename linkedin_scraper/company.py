@@ -1,17 +1,35 @@
-import requests
-from lxml import html
-from selenium import webdriver
+from lxml import etree, html
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import TimeoutException
+from .browser import get_driver
 from .objects import Scraper
-from .person import Person
-import time
-import os
+from .selectors import has_class
 import json
 
-AD_BANNER_CLASSNAME = ('ad-banner-container', '__ad')
+ABOUT_CARD = ".org-page-details-module__card-spacing.org-about-module__margin-bottom"
+ABOUT_GRID = etree.XPath(f"//*[{has_class('org-page-details-module__card-spacing')}][{has_class('org-about-module__margin-bottom')}]")
+HEADCOUNT_GRID = etree.XPath(f"//*[{has_class('mt1')}]")
+FIRST_PARAGRAPH = etree.XPath("(.//p)[1]")
+LABELS = etree.XPath(".//dt")
+VALUES = etree.XPath(".//dd")
+SPANS = etree.XPath(".//span")
+COMPANY_LISTS = etree.XPath(f"//*[{has_class('company-list')}]")
+COMPANY_CARDS = etree.XPath(f".//*[{has_class('org-company-card')}]")
+COMPANY_NAME_LINK = etree.XPath(f"(.//*[{has_class('company-name-link')}])[1]")
+COMPANY_FOLLOWERS = etree.XPath(f"(.//*[{has_class('company-followers-count')}])[1]")
+
+def _squash(elem):
+    return " ".join(elem.text_content().split())
+
+def _company_summary(card):
+    link = COMPANY_NAME_LINK(card)[0]
+    return CompanySummary(
+        linkedin_url = link.get("href"),
+        name = _squash(link),
+        followers = _squash(COMPANY_FOLLOWERS(card)[0])
+    )
 
 def getchildren(elem):
     return elem.find_elements(By.XPATH, ".//*")
@@ -28,9 +46,9 @@ class CompanySummary(object):
 
     def __repr__(self):
         if self.followers == None:
-            return """ {name} """.format(name = self.name)
+            return f" {self.name} "
         else:
-            return """ {name} {followers} """.format(name = self.name, followers = self.followers)
+            return f" {self.name} {self.followers} "
 
 class Company(Scraper):
     linkedin_url = None
@@ -44,12 +62,9 @@ class Company(Scraper):
     company_type = None
     company_size = None
     specialties = None
-    showcase_pages = []
-    affiliated_companies = []
-    employees = []
     headcount = None
 
-    def __init__(self, linkedin_url = None, name = None, about_us =None, website = None, phone = None, headquarters = None, founded = None, industry = None, company_type = None, company_size = None, specialties = None, showcase_pages =[], affiliated_companies = [], driver = None, scrape = True, get_employees = True, close_on_complete = True):
+    def __init__(self, linkedin_url = None, name = None, about_us =None, website = None, phone = None, headquarters = None, founded = None, industry = None, company_type = None, company_size = None, specialties = None, showcase_pages = None, affiliated_companies = None, driver = None, scrape = True, get_employees = True, close_on_complete = True):
         self.linkedin_url = linkedin_url
         self.name = name
         self.about_us = about_us
@@ -61,19 +76,13 @@ class Company(Scraper):
         self.company_type = company_type
         self.company_size = company_size
         self.specialties = specialties
-        self.showcase_pages = showcase_pages
-        self.affiliated_companies = affiliated_companies
+        self.showcase_pages = [] if showcase_pages is None else list(showcase_pages)
+        self.affiliated_companies = [] if affiliated_companies is None else list(affiliated_companies)
+        self.employees = []
 
-        if driver is None:
-            try:
-                if os.getenv("CHROMEDRIVER") == None:
-                    driver_path = os.path.join(os.path.dirname(__file__), 'drivers/chromedriver')
-                else:
-                    driver_path = os.getenv("CHROMEDRIVER")
-
-                driver = webdriver.Chrome(driver_path)
-            except:
-                driver = webdriver.Chrome()
+        self._pooled_driver = driver is None
+        if self._pooled_driver:
+            driver = get_driver()
 
         driver.get(linkedin_url)
         self.driver = driver
@@ -124,34 +133,28 @@ class Company(Scraper):
         next_xpath = '//button[@aria-label="Next"]'
         driver = self.driver
 
-        try:
-            see_all_employees = driver.find_element(By.XPATH,'//a[@data-control-name="topcard_see_all_employees"]')
-        except:
-            pass
-        driver.get(os.path.join(self.linkedin_url, "people"))
+        driver.get(f"{self.linkedin_url.rstrip('/')}/people")
 
         _ = WebDriverWait(driver, 3).until(EC.presence_of_all_elements_located((By.XPATH, '//span[@dir="ltr"]')))
 
-        driver.execute_script("window.scrollTo(0, Math.ceil(document.body.scrollHeight/2));")
-        time.sleep(1)
-        driver.execute_script("window.scrollTo(0, Math.ceil(document.body.scrollHeight*3/4));")
-        time.sleep(1)
-
-        results_list = driver.find_element(By.CLASS_NAME, list_css)
-        results_li = results_list.find_elements(By.TAG_NAME, "li")
+        # scroll the results list itself into view instead of guessing how far
+        # down the page it sits, so its lazy rendering starts on the first try
+        results_list = self.reveal_and_wait(f".{list_css}", wait_time)
+        results_li = WebDriverWait(driver, wait_time).until(lambda _: results_list.find_elements(By.TAG_NAME, "li"))
         for res in results_li:
             total.append(self.__parse_employee__(res))
 
-        def is_loaded(previous_results):
-          loop = 0
-          driver.execute_script("window.scrollTo(0, Math.ceil(document.body.scrollHeight));")
-          results_li = results_list.find_elements(By.TAG_NAME, "li")
-          while len(results_li) == previous_results and loop <= 5:
-            time.sleep(1)
+        def has_more_results(previous_results):
+          # keep nudging the lazy list and move on as soon as it grows, rather
+          # than sleeping a second between checks
+          def grew(driver):
             driver.execute_script("window.scrollTo(0, Math.ceil(document.body.scrollHeight));")
-            results_li = results_list.find_elements(By.TAG_NAME, "li")
-            loop += 1
-          return loop <= 5
+            return len(results_list.find_elements(By.TAG_NAME, "li")) != previous_results
+          try:
+            WebDriverWait(driver, 6, poll_frequency=0.5).until(grew)
+            return True
+          except TimeoutException:
+            return False
 
         def get_data(previous_results):
             results_li = results_list.find_elements(By.TAG_NAME, "li")
@@ -159,21 +162,13 @@ class Company(Scraper):
                 total.append(self.__parse_employee__(res))
 
         results_li_len = len(results_li)
-        while is_loaded(results_li_len):
-            try:
-                driver.find_element(By.XPATH,next_xpath).click()
-            except:
-                pass
+        while has_more_results(results_li_len):
+            next_buttons = driver.find_elements(By.XPATH, next_xpath)
+            if next_buttons:
+                next_buttons[0].click()
             _ = WebDriverWait(driver, wait_time).until(EC.presence_of_element_located((By.CLASS_NAME, list_css)))
 
-            driver.execute_script("window.scrollTo(0, Math.ceil(document.body.scrollHeight/2));")
-            time.sleep(1)
-            driver.execute_script("window.scrollTo(0, Math.ceil(document.body.scrollHeight*2/3));")
-            time.sleep(1)
-            driver.execute_script("window.scrollTo(0, Math.ceil(document.body.scrollHeight*3/4));")
-            time.sleep(1)
-            driver.execute_script("window.scrollTo(0, Math.ceil(document.body.scrollHeight));")
-            time.sleep(1)
+            self.scroll_to_bottom_until_stable()
 
             get_data(results_li_len)
             results_li_len = len(total)
@@ -190,95 +185,79 @@ class Company(Scraper):
 
         navigation = driver.find_element(By.CLASS_NAME, "org-page-navigation__items ")
 
-        self.name = driver.find_element(By.CLASS_NAME,"org-top-card-summary__title").text.strip()
+        self.name = driver.find_element(By.CLASS_NAME,"org-top-card-summary__title").get_dom_property("innerText").strip()
 
         # Click About Tab or View All Link
-        try:
-          self.__find_first_available_element__(
-            navigation.find_elements(By.XPATH, "//a[@data-control-name='page_member_main_nav_about_tab']"),
-            navigation.find_elements(By.XPATH, "//a[@data-control-name='org_about_module_see_all_view_link']"),
-          ).click()
-        except:
-          driver.get(os.path.join(self.linkedin_url, "about"))
+        about_link = self.__find_first_available_element__(
+          navigation.find_elements(By.XPATH, "//a[@data-control-name='page_member_main_nav_about_tab']"),
+          navigation.find_elements(By.XPATH, "//a[@data-control-name='org_about_module_see_all_view_link']"),
+        )
+        if about_link:
+          about_link.click()
+        else:
+          driver.get(f"{self.linkedin_url.rstrip('/')}/about")
 
         _ = WebDriverWait(driver, 3).until(EC.presence_of_all_elements_located((By.TAG_NAME, 'section')))
-        time.sleep(3)
+        self.wait_for_selector(ABOUT_CARD, 3)
 
-        if 'Cookie Policy' in driver.find_elements(By.TAG_NAME, "section")[1].text or any(classname in driver.find_elements(By.TAG_NAME, "section")[1].get_attribute('class') for classname in AD_BANNER_CLASSNAME):
-            section_id = 4
-        else:
-            section_id = 3
-       #section ID is no longer needed, we are using class name now.
-        #grid = driver.find_elements_by_tag_name("section")[section_id]
-        grid = driver.find_element(By.CLASS_NAME, "artdeco-card.org-page-details-module__card-spacing.artdeco-card.org-about-module__margin-bottom")
-        print(grid)
-        descWrapper = grid.find_elements(By.TAG_NAME, "p")
+        # everything on the about page is read from one snapshot of it
+        tree = html.fromstring(driver.page_source)
+        grid = ABOUT_GRID(tree)[0]
+        descWrapper = FIRST_PARAGRAPH(grid)
         if len(descWrapper) > 0:
-            self.about_us = descWrapper[0].text.strip()
-        labels = grid.find_elements(By.TAG_NAME, "dt")
-        values = grid.find_elements(By.TAG_NAME, "dd")
+            self.about_us = descWrapper[0].text_content().strip()
+        labels = [_squash(label) for label in LABELS(grid)]
+        values = [_squash(value) for value in VALUES(grid)]
         num_attributes = min(len(labels), len(values))
         #print("The length of the labels is " + str(len(labels)), "The length of the values is " + str(len(values)))
         # if num_attributes == 0:
         #     exit()
         x_off = 0
         for i in range(num_attributes):
-            txt = labels[i].text.strip()
+            txt = labels[i]
             if txt == 'Website':
-                self.website = values[i+x_off].text.strip()
+                self.website = values[i+x_off]
             if txt == 'Phone':
-                self.phone = values[i+x_off].text.strip()
+                self.phone = values[i+x_off]
             elif txt == 'Industry':
-                self.industry = values[i+x_off].text.strip()
+                self.industry = values[i+x_off]
             elif txt == 'Company size':
-                self.company_size = values[i+x_off].text.strip()
+                self.company_size = values[i+x_off]
                 if len(values) > len(labels):
                     x_off = 1
             elif txt == 'Headquarters':
-                    self.headquarters = values[i+x_off].text.strip()
+                    self.headquarters = values[i+x_off]
             elif txt == 'Type':
-                self.company_type = values[i+x_off].text.strip()
+                self.company_type = values[i+x_off]
             elif txt == 'Founded':
-                self.founded = values[i+x_off].text.strip()
+                self.founded = values[i+x_off]
             elif txt == 'Specialties':
-                self.specialties = "\n".join(values[i+x_off].text.strip().split(", "))
-
-        try:
-            grid = driver.find_element(By.CLASS_NAME, "mt1")
-            spans = grid.find_elements(By.TAG_NAME, "span")
-            for span in spans:
-                txt = span.text.strip()
-                if "See all" in txt and "employees on LinkedIn" in txt:
-                    self.headcount = int(txt.replace("See all", "").replace("employees on LinkedIn", "").strip())
-        except NoSuchElementException: # Does not exist in page, skip it
-            pass
-
-        driver.execute_script("window.scrollTo(0, Math.ceil(document.body.scrollHeight/2));")
+                self.specialties = "\n".join(values[i+x_off].split(", "))
 
+        grids = HEADCOUNT_GRID(tree)
+        spans = SPANS(grids[0]) if grids else []
+        for span in spans:
+            txt = _squash(span)
+            if "See all" in txt and "employees on LinkedIn" in txt:
+                self.headcount = int(txt.replace("See all", "").replace("employees on LinkedIn", "").strip())
 
         try:
-            _ = WebDriverWait(driver, 3).until(EC.presence_of_element_located((By.CLASS_NAME, 'company-list')))
-            showcase, affiliated = driver.find_elements(By.CLASS_NAME, "company-list")
+            self.reveal_and_wait(".company-list", 3)
             driver.find_element(By.ID,"org-related-companies-module__show-more-btn").click()
 
+            # the expanded lists are read from one snapshot rather than three
+            # lookups per card
+            tree = html.fromstring(driver.page_source, base_url=driver.current_url)
+            tree.make_links_absolute()
+            showcase, affiliated = COMPANY_LISTS(tree)
+
             # get showcase
-            for showcase_company in showcase.find_elements(By.CLASS_NAME, "org-company-card"):
-                companySummary = CompanySummary(
-                        linkedin_url = showcase_company.find_element(By.CLASS_NAME, "company-name-link").get_attribute("href"),
-                        name = showcase_company.find_element(By.CLASS_NAME, "company-name-link").text.strip(),
-                        followers = showcase_company.find_element(By.CLASS_NAME, "company-followers-count").text.strip()
-                    )
-                self.showcase_pages.append(companySummary)
+            for showcase_company in COMPANY_CARDS(showcase):
+                self.showcase_pages.append(_company_summary(showcase_company))
 
             # affiliated company
-
-            for affiliated_company in showcase.find_element(By.CLASS_NAME, "org-company-card"):
-                companySummary = CompanySummary(
-                         linkedin_url = affiliated_company.find_element(By.CLASS_NAME, "company-name-link").get_attribute("href"),
-                        name = affiliated_company.find_element(By.CLASS_NAME, "company-name-link").text.strip(),
-                        followers = affiliated_company.find_element(By.CLASS_NAME, "company-followers-count").text.strip()
-                        )
-                self.affiliated_companies.append(companySummary)
+            for affiliated_company in COMPANY_CARDS(affiliated):
+                self.affiliated_companies.append(_company_summary(affiliated_company))
 
         except:
             pass
@@ -289,24 +268,27 @@ class Company(Scraper):
         driver.get(self.linkedin_url)
 
         if close_on_complete:
-            driver.close()
+            self.close_driver()
 
     def scrape_not_logged_in(self, close_on_complete = True, retry_limit = 10, get_employees = True):
         driver = self.driver
-        retry_times = 0
-        while self.is_signed_in() and retry_times <= retry_limit:
-            page = driver.get(self.linkedin_url)
-            retry_times = retry_times + 1
+        # reloading the page never signed anyone out, so drop the session once
+        # and check that it took
+        driver.delete_all_cookies()
+        driver._linkedin_signed_in = False
+        driver.get(self.linkedin_url)
+        if self.is_signed_in():
+            raise RuntimeError("Could not sign out to scrape the public company page")
 
-        self.name = driver.find_element(By.CLASS_NAME, "name").text.strip()
+        self.name = driver.find_element(By.CLASS_NAME, "name").get_dom_property("innerText").strip()
 
-        self.about_us = driver.find_element(By.CLASS_NAME, "basic-info-description").text.strip()
+        self.about_us = driver.find_element(By.CLASS_NAME, "basic-info-description").get_dom_property("innerText").strip()
         self.specialties = self.__get_text_under_subtitle_by_class(driver, "specialties")
         self.website = self.__get_text_under_subtitle_by_class(driver, "website")
         self.phone = self.__get_text_under_subtitle_by_class(driver, "phone")
-        self.headquarters = driver.find_element(By.CLASS_NAME, "adr").text.strip()
-        self.industry = driver.find_element(By.CLASS_NAME, "industry").text.strip()
-        self.company_size = driver.find_element(By.CLASS_NAME, "company-size").text.strip()
+        self.headquarters = driver.find_element(By.CLASS_NAME, "adr").get_dom_property("innerText").strip()
+        self.industry = driver.find_element(By.CLASS_NAME, "industry").get_dom_property("innerText").strip()
+        self.company_size = driver.find_element(By.CLASS_NAME, "company-size").get_dom_property("innerText").strip()
         self.company_type = self.__get_text_under_subtitle_by_class(driver, "type")
         self.founded = self.__get_text_under_subtitle_by_class(driver, "founded")
 
@@ -320,8 +302,8 @@ class Company(Scraper):
                 name_elem = showcase_company.find_element(By.CLASS_NAME, "name")
                 companySummary = CompanySummary(
                     linkedin_url = name_elem.find_element(By.TAG_NAME, "a").get_attribute("href"),
-                    name = name_elem.text.strip(),
-                    followers = showcase_company.text.strip().split("\n")[1]
+                    name = name_elem.get_dom_property("innerText").strip(),
+                    followers = showcase_company.get_dom_property("innerText").strip().split("\n")[1]
                 )
                 self.showcase_pages.append(companySummary)
             driver.find_element(By.CLASS_NAME, "dialog-close").click()
@@ -337,7 +319,7 @@ class Company(Scraper):
 
                 companySummary = CompanySummary(
                     linkedin_url = affiliated_page.find_element(By.TAG_NAME, "a").get_attribute("href"),
-                    name = affiliated_page.text.strip()
+                    name = affiliated_page.get_dom_property("innerText").strip()
                 )
                 self.affiliated_companies.append(companySummary)
         except:
@@ -349,7 +331,7 @@ class Company(Scraper):
         driver.get(self.linkedin_url)
 
         if close_on_complete:
-            driver.close()
+            self.close_driver()
 
     def __repr__(self):
         _output = {}
@@ -1,20 +1,44 @@
-import os
-from typing import List
-from time import sleep
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Union
 import urllib.parse
 
-from .objects import Scraper
-from . import constants as c
+from .objects import Scraper, outcome
 from .jobs import Job
 
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
+
+JOB_CARD_CLASS_NAMES = {
+    "title": "job-card-list__title",
+    "company": "artdeco-entity-lockup__subtitle",
+    "location": "job-card-container__metadata-wrapper",
+    "location_item": "job-card-container__metadata-item",
+}
 
 
 class JobSearch(Scraper):
     AREAS = ["recommended_jobs", None, "still_hiring", "more_jobs"]
+    EXTRACT_JOB_CARDS_JS = """
+        var root = arguments[0], cardClassName = arguments[1], classNames = arguments[2];
+        function text(card, className) {
+            var elem = card.getElementsByClassName(className)[0];
+            return elem ? elem.innerText.trim() : null;
+        }
+        // without a card class name, root is itself the card
+        var cards = cardClassName ? Array.prototype.slice.call(root.getElementsByClassName(cardClassName)) : [root];
+        return cards.map(function (card) {
+            var title = card.getElementsByClassName(classNames.title)[0];
+            if (!title) {
+                return null;
+            }
+            return {
+                linkedin_url: title.href,
+                job_title: title.innerText.trim(),
+                company: text(card, classNames.company),
+                location: text(card, classNames.location) || text(card, classNames.location_item)
+            };
+        }).filter(Boolean);
+    """
 
     def __init__(self, driver, base_url="https://www.linkedin.com/jobs/", close_on_complete=False, scrape=True, scrape_recommended_jobs=True):
         super().__init__()
@@ -33,59 +57,111 @@ class JobSearch(Scraper):
 
 
     def scrape_job_card(self, base_element) -> Job:
-        job_div = self.wait_for_element_to_load(name="job-card-list__title", base=base_element)
-        job_title = job_div.text.strip()
-        linkedin_url = job_div.get_attribute("href")
-        company = base_element.find_element_by_class_name("artdeco-entity-lockup__subtitle").text
-        location = base_element.find_element_by_class_name("job-card-container__metadata-wrapper").text
-        job = Job(linkedin_url=linkedin_url, job_title=job_title, company=company, location=location, scrape=False, driver=self.driver)
-        return job
+        self.wait_for_element_to_load(name=JOB_CARD_CLASS_NAMES["title"], base=base_element)
+        return self._scrape_job_cards(base_element)[0]
+
+
+    def _scrape_job_cards(self, base_element, card_class_name=None) -> List[Job]:
+        # reads every card under base_element in one round-trip
+        rows = self.driver.execute_script(self.EXTRACT_JOB_CARDS_JS, base_element, card_class_name, JOB_CARD_CLASS_NAMES)
+        return [Job(scrape=False, driver=self.driver, **row) for row in rows]
 
 
     def scrape_logged_in(self, close_on_complete=True, scrape_recommended_jobs=True):
         driver = self.driver
         driver.get(self.base_url)
         if scrape_recommended_jobs:
-            self.focus()
-            sleep(self.WAIT_FOR_ELEMENT_TIMEOUT)
-            job_area = self.wait_for_element_to_load(name="scaffold-finite-scroll__content")
+            job_area = self.reveal_and_wait(".scaffold-finite-scroll__content")
             areas = self.wait_for_all_elements_to_load(name="artdeco-card", base=job_area)
+            # the same posting often shows up in more than one area, so keep a
+            # single Job per url and share it between the area lists
+            seen = {}
             for i, area in enumerate(areas):
                 area_name = self.AREAS[i]
                 if not area_name:
                     continue
-                area_results = []
-                for job_posting in area.find_elements_by_class_name("jobs-job-board-list__item"):
-                    job = self.scrape_job_card(job_posting)
-                    area_results.append(job)
+                area_results = [
+                    seen.setdefault(job.linkedin_url, job)
+                    for job in self._scrape_job_cards(area, "jobs-job-board-list__item")
+                ]
                 setattr(self, area_name, area_results)
         return
 
 
+    def _wait_for_more_job_cards(self, job_listing, previous_count):
+        # a MutationObserver in the page returns as soon as new cards are
+        # appended, falling back to the current count after the timeout
+        return self.driver.execute_async_script(
+            """
+            var list = arguments[0], previous = arguments[1], timeout = arguments[2];
+            var callback = arguments[arguments.length - 1];
+            function count() {
+                return list.getElementsByClassName("job-card-list").length;
+            }
+            if (count() > previous) {
+                return callback(count());
+            }
+            var timer;
+            var observer = new MutationObserver(function () {
+                if (count() > previous) {
+                    observer.disconnect();
+                    clearTimeout(timer);
+                    callback(count());
+                }
+            });
+            timer = setTimeout(function () {
+                observer.disconnect();
+                callback(count());
+            }, timeout);
+            observer.observe(list, {childList: true, subtree: true});
+            """,
+            job_listing,
+            previous_count,
+            self.WAIT_FOR_ELEMENT_TIMEOUT * 1000,
+        )
+
+
     def search(self, search_term: str) -> List[Job]:
-        url = os.path.join(self.base_url, "search") + f"?keywords={urllib.parse.quote(search_term)}&refresh=true"
+        url = f"{self.base_url.rstrip('/')}/search?keywords={urllib.parse.quote(search_term)}&refresh=true"
         self.driver.get(url)
         self.scroll_to_bottom()
         self.focus()
-        sleep(self.WAIT_FOR_ELEMENT_TIMEOUT)
 
         job_listing_class_name = "jobs-search-results-list"
         job_listing = self.wait_for_element_to_load(name=job_listing_class_name)
 
-        self.scroll_class_name_element_to_page_percent(job_listing_class_name, 0.3)
-        self.focus()
-        sleep(self.WAIT_FOR_ELEMENT_TIMEOUT)
-
-        self.scroll_class_name_element_to_page_percent(job_listing_class_name, 0.6)
-        self.focus()
-        sleep(self.WAIT_FOR_ELEMENT_TIMEOUT)
-
-        self.scroll_class_name_element_to_page_percent(job_listing_class_name, 1)
-        self.focus()
-        sleep(self.WAIT_FOR_ELEMENT_TIMEOUT)
-
-        job_results = []
-        for job_card in self.wait_for_all_elements_to_load(name="job-card-list", base=job_listing):
-            job = self.scrape_job_card(job_card)
-            job_results.append(job)
-        return job_results
+        card_count = len(job_listing.find_elements(By.CLASS_NAME, "job-card-list"))
+        idle_scrolls = 0
+        for page_percent in (0.3, 0.6, 1):
+            self.scroll_class_name_element_to_page_percent(job_listing_class_name, page_percent)
+            self.focus()
+            new_card_count = self._wait_for_more_job_cards(job_listing, card_count)
+            idle_scrolls = idle_scrolls + 1 if new_card_count == card_count else 0
+            card_count = new_card_count
+            # the whole list is already there if two scrolls in a row added nothing
+            if idle_scrolls == 2:
+                break
+
+        self.wait_for_all_elements_to_load(name="job-card-list", base=job_listing)
+        return self._scrape_job_cards(job_listing, "job-card-list")
+
+
+    def scrape_jobs(self, jobs: List[Job], drivers=None) -> List[Union[Job, Exception]]:
+        # each driver must already be logged in; jobs are spread across them
+        drivers = drivers or [self.driver]
+        available = queue.Queue()
+        for driver in drivers:
+            available.put(driver)
+
+        def scrape_job(job):
+            driver = available.get()
+            try:
+                job.driver = driver
+                job.scrape(close_on_complete=False)
+            finally:
+                available.put(driver)
+            return job
+
+        with ThreadPoolExecutor(max_workers=len(drivers)) as executor:
+            futures = [executor.submit(scrape_job, job) for job in jobs]
+            return [outcome(future) for future in futures]
@@ -1,13 +1,29 @@
+import threading
+import urllib.parse
+from collections import OrderedDict
+
+from lxml import etree, html
 from selenium.common.exceptions import TimeoutException
 
-from .objects import Scraper
-from . import constants as c
+from .objects import Scraper, http_session, raise_for_public_response
+from .selectors import first_text, has_class
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+
+JOB_CACHE_SIZE = 512
+_job_cache = OrderedDict()
+_job_cache_lock = threading.Lock()
+
+# markup of the job pages linkedin serves to visitors that aren't logged in
+PUBLIC_JOB_TITLE = etree.XPath(f"//h1[{has_class('top-card-layout__title')}]")
+PUBLIC_COMPANY = etree.XPath(f"//a[{has_class('topcard__org-name-link')}]")
+PUBLIC_LOCATION = etree.XPath(f"//span[{has_class('topcard__flavor--bullet')}]")
+PUBLIC_POSTED_DATE = etree.XPath(f"//span[{has_class('posted-time-ago__text')}]")
+PUBLIC_APPLICANT_COUNT = etree.XPath(f"//*[{has_class('num-applicants__caption')}]")
+PUBLIC_DESCRIPTION = etree.XPath(f"//div[{has_class('show-more-less-html__markup')}]")
 
 
 class Job(Scraper):
+    OPTIONAL_ELEMENT_TIMEOUT = 1
 
     def __init__(
         self,
@@ -43,10 +59,10 @@ class Job(Scraper):
         return f"<Job {self.job_title} {self.company}>"
 
     def scrape(self, close_on_complete=True):
-        if self.is_signed_in():
+        if self.driver is not None and self.is_signed_in():
             self.scrape_logged_in(close_on_complete=close_on_complete)
         else:
-            raise NotImplemented("This part is not implemented yet")
+            self.scrape_not_logged_in(close_on_complete=close_on_complete)
 
     def to_dict(self):
         return {
@@ -64,30 +80,82 @@ class Job(Scraper):
 
     def scrape_logged_in(self, close_on_complete=True):
         driver = self.driver
-        
+
+        with _job_cache_lock:
+            cached = _job_cache.get(self.linkedin_url)
+            if cached is not None:
+                _job_cache.move_to_end(self.linkedin_url)
+        if cached is not None:
+            for key, value in cached.items():
+                setattr(self, key, value)
+            if close_on_complete:
+                driver.close()
+            return
+
         driver.get(self.linkedin_url)
         self.focus()
-        self.job_title = self.wait_for_element_to_load(name="job-details-jobs-unified-top-card__job-title").text.strip()
-        self.company = self.wait_for_element_to_load(name="job-details-jobs-unified-top-card__company-name").text.strip()
-        self.company_linkedin_url = self.wait_for_element_to_load(name="job-details-jobs-unified-top-card__company-name").find_element(By.TAG_NAME,"a").get_attribute("href")
-        primary_descriptions = self.wait_for_element_to_load(name="job-details-jobs-unified-top-card__primary-description-container").find_elements(By.TAG_NAME, "span")
-        texts = [span.text for span in primary_descriptions if span.text.strip() != ""]
-        self.location = texts[0]
-        self.posted_date = texts[3]
-        
-        try:
-            self.applicant_count = self.wait_for_element_to_load(name="jobs-unified-top-card__applicant-count").text.strip()
-        except TimeoutException:
-            self.applicant_count = 0
-        job_description_elem = self.wait_for_element_to_load(name="jobs-description")
-        self.mouse_click(job_description_elem.find_element(By.TAG_NAME, "button"))
+        self.job_title = self.wait_for_element_to_load(name="job-details-jobs-unified-top-card__job-title").get_dom_property("innerText").strip()
+        company_elem = self.wait_for_element_to_load(name="job-details-jobs-unified-top-card__company-name")
+        self.company = company_elem.get_dom_property("innerText").strip()
+        self.company_linkedin_url = company_elem.find_element(By.TAG_NAME,"a").get_attribute("href")
+        primary_description = self.wait_for_element_to_load(name="job-details-jobs-unified-top-card__primary-description-container")
+        texts = driver.execute_script(
+            "return Array.prototype.map.call(arguments[0].getElementsByTagName('span'), function (span) { return span.innerText; })"
+            ".filter(function (text) { return text.trim() !== ''; });",
+            primary_description
+        )
+        self.location = texts[0] if texts else None
+        self.posted_date = texts[3] if len(texts) > 3 else None
+
         job_description_elem = self.wait_for_element_to_load(name="jobs-description")
-        job_description_elem.find_element(By.TAG_NAME, "button").click()
-        self.job_description = job_description_elem.text.strip()
-        try:
-            self.benefits = self.wait_for_element_to_load(name="jobs-unified-description__salary-main-rail-card").text.strip()
-        except TimeoutException:
-            self.benefits = None
+        see_more_button = job_description_elem.find_element(By.TAG_NAME, "button")
+        self.mouse_click(see_more_button)
+        see_more_button.click()
+        self.job_description = job_description_elem.get_dom_property("innerText").strip()
+
+        # the applicant count and the salary card are often missing, so they
+        # get a short wait and share one check of the implicit wait
+        with self.no_implicit_wait():
+            try:
+                self.applicant_count = self.wait_for_element_to_load(name="jobs-unified-top-card__applicant-count", timeout=self.OPTIONAL_ELEMENT_TIMEOUT).get_dom_property("innerText").strip()
+            except TimeoutException:
+                self.applicant_count = 0
+            try:
+                self.benefits = self.wait_for_element_to_load(name="jobs-unified-description__salary-main-rail-card", timeout=self.OPTIONAL_ELEMENT_TIMEOUT).get_dom_property("innerText").strip()
+            except TimeoutException:
+                self.benefits = None
+
+        with _job_cache_lock:
+            _job_cache[self.linkedin_url] = self.to_dict()
+            if len(_job_cache) > JOB_CACHE_SIZE:
+                _job_cache.popitem(last=False)
 
         if close_on_complete:
             driver.close()
+
+    def _public_url(self):
+        # the logged in collection urls carry the job in currentJobId, but only
+        # /jobs/view/<id> is served without logging in
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.linkedin_url).query)
+        if "currentJobId" in query:
+            return f"https://www.linkedin.com/jobs/view/{query['currentJobId'][0]}/"
+        return self.linkedin_url
+
+    def scrape_not_logged_in(self, close_on_complete=True, session=None):
+        session = session or http_session
+        response = session.get(self._public_url(), timeout=10)
+        raise_for_public_response(response)
+        tree = html.fromstring(response.content)
+
+        self.job_title = first_text(tree, PUBLIC_JOB_TITLE)
+        self.company = first_text(tree, PUBLIC_COMPANY)
+        company_links = PUBLIC_COMPANY(tree)
+        self.company_linkedin_url = company_links[0].get("href") if company_links else None
+        self.location = first_text(tree, PUBLIC_LOCATION)
+        self.posted_date = first_text(tree, PUBLIC_POSTED_DATE)
+        self.applicant_count = first_text(tree, PUBLIC_APPLICANT_COUNT)
+        descriptions = PUBLIC_DESCRIPTION(tree)
+        self.job_description = descriptions[0].text_content().strip() if descriptions else None
+
+        if close_on_complete and self.driver is not None:
+            self.driver.close()
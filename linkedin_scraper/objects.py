@@ -1,24 +1,71 @@
-from dataclasses import dataclass
+import sys
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
 from time import sleep
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from selenium.webdriver import Chrome
 
 from . import constants as c
+from .browser import release_driver
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+# shared by the pages that can be read without a browser, so keep-alive
+# connections to linkedin are reused between scrapes. rate limits and flaky
+# gateway errors are retried with backoff, and the last response is handed back
+# to the caller's raise_for_status instead of raising here
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,
+    ),
+))
+http_session.headers.update({"User-Agent": c.USER_AGENT})
+
+
+def raise_for_public_response(response):
+    # linkedin turns scrapers away with a non-standard 999, and sends visitors
+    # it wants logged in to /authwall with a 200, neither of which
+    # raise_for_status catches, and both of which would parse as empty
+    response.raise_for_status()
+    if response.status_code == 999 or "/authwall" in response.url:
+        raise requests.HTTPError(
+            f"{response.status_code} LinkedIn refused the request for url: {response.url}",
+            response=response,
+        )
 
 
-@dataclass
+def outcome(future):
+    # an item of a batch that failed is reported in its own slot instead of
+    # raising and throwing away the rest of the batch
+    error = future.exception()
+    return future.result() if error is None else error
+
+
+# the scraped records are created by the thousand in batch scrapes, so they
+# drop the per-instance __dict__ where dataclasses support it (3.10+)
+_record = dataclass(slots=True) if sys.version_info >= (3, 10) else dataclass
+
+@_record
 class Contact:
     name: str = None
     occupation: str = None
     url: str = None
 
 
-@dataclass
+@_record
 class Institution:
     institution_name: str = None
     linkedin_url: str = None
@@ -30,7 +77,7 @@ class Institution:
     founded: int = None
 
 
-@dataclass
+@_record
 class Experience(Institution):
     from_date: str = None
     to_date: str = None
@@ -40,7 +87,7 @@ class Experience(Institution):
     location: str = None
 
 
-@dataclass
+@_record
 class Education(Institution):
     from_date: str = None
     to_date: str = None
@@ -48,15 +95,44 @@ class Education(Institution):
     degree: str = None
 
 
-@dataclass
+@_record
 class Interest(Institution):
-    title = None
+    title: str = None
 
 
-@dataclass
+@_record
 class Accomplishment(Institution):
-    category = None
-    title = None
+    category: str = None
+    title: str = None
+
+
+# just the scraped fields of a Person, without the driver, so it can be
+# stored, sent to another process or turned into json
+@_record
+class PersonData:
+    linkedin_url: str = None
+    name: str = None
+    about: str = None
+    open_to_work: bool = None
+    experiences: list = field(default_factory=list)
+    educations: list = field(default_factory=list)
+    interests: list = field(default_factory=list)
+    accomplishments: list = field(default_factory=list)
+    contacts: list = field(default_factory=list)
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        # a missing list is as likely to be serialized as null as left out
+        data["experiences"] = [Experience(**item) for item in data.get("experiences") or []]
+        data["educations"] = [Education(**item) for item in data.get("educations") or []]
+        data["interests"] = [Interest(**item) for item in data.get("interests") or []]
+        data["accomplishments"] = [Accomplishment(**item) for item in data.get("accomplishments") or []]
+        data["contacts"] = [Contact(**item) for item in data.get("contacts") or []]
+        return cls(**data)
 
 
 @dataclass
@@ -65,6 +141,15 @@ class Scraper:
     WAIT_FOR_ELEMENT_TIMEOUT = 5
     TOP_CARD = "pv-top-card"
 
+    def close_driver(self):
+        # drivers the scraper took from the pool go back to it for the next
+        # one; a driver the caller passed in is only reached here when they
+        # asked for it with close_on_complete=True, so it's quit
+        if getattr(self, "_pooled_driver", False):
+            release_driver(self.driver)
+        else:
+            self.driver.quit()
+
     @staticmethod
     def wait(duration):
         sleep(int(duration))
@@ -77,9 +162,24 @@ class Scraper:
         action = webdriver.ActionChains(self.driver)
         action.move_to_element(elem).perform()
 
-    def wait_for_element_to_load(self, by=By.CLASS_NAME, name="pv-top-card", base=None):
+    @contextmanager
+    def no_implicit_wait(self):
+        # an implicit wait on the driver makes every failed poll inside an
+        # explicit wait block for that long, so turn it off for optional lookups
+        implicit_wait = self.driver.timeouts.implicit_wait
+        # nothing in the package sets one, so usually there's nothing to undo
+        if not implicit_wait:
+            yield
+            return
+        self.driver.implicitly_wait(0)
+        try:
+            yield
+        finally:
+            self.driver.implicitly_wait(implicit_wait)
+
+    def wait_for_element_to_load(self, by=By.CLASS_NAME, name="pv-top-card", base=None, timeout=None):
         base = base or self.driver
-        return WebDriverWait(base, self.WAIT_FOR_ELEMENT_TIMEOUT).until(
+        return WebDriverWait(base, timeout or self.WAIT_FOR_ELEMENT_TIMEOUT).until(
             EC.presence_of_element_located(
                 (
                     by,
@@ -88,6 +188,66 @@ class Scraper:
             )
         )
 
+    def wait_for_selector(self, css_selector, timeout=None):
+        # polls inside the page, so the whole wait is one round-trip and a
+        # missing element just comes back False instead of raising
+        return self.driver.execute_async_script(
+            """
+            var selector = arguments[0], timeout = arguments[1];
+            var callback = arguments[arguments.length - 1];
+            var start = Date.now();
+            (function poll() {
+                if (document.readyState !== "loading" && document.querySelector(selector)) {
+                    return callback(true);
+                }
+                if (Date.now() - start > timeout) {
+                    return callback(false);
+                }
+                setTimeout(poll, 50);
+            })();
+            """,
+            css_selector,
+            int((timeout or self.WAIT_FOR_ELEMENT_TIMEOUT) * 1000),
+        )
+
+    def reveal_and_wait(self, css_selector, timeout=None):
+        # scrolling the target into view is what triggers linkedin's lazy
+        # rendering, so there's no need to focus the window or sleep first.
+        # a lazy section isn't in the dom at all until the viewport nears it,
+        # so while it's missing the page is scrolled further down instead
+        timeout = timeout or self.WAIT_FOR_ELEMENT_TIMEOUT
+        found = self.driver.execute_async_script(
+            """
+            var selector = arguments[0], timeout = arguments[1];
+            var callback = arguments[arguments.length - 1];
+            var start = Date.now();
+            (function poll() {
+                var elem = document.querySelector(selector);
+                if (elem) {
+                    elem.scrollIntoView({block: "center"});
+                    return callback(true);
+                }
+                if (Date.now() - start > timeout) {
+                    return callback(false);
+                }
+                window.scrollBy(0, Math.ceil(window.innerHeight / 2));
+                setTimeout(poll, 100);
+            })();
+            """,
+            css_selector,
+            int(timeout * 1000),
+        )
+        if not found:
+            raise TimeoutException(f"{css_selector} never rendered")
+        return WebDriverWait(self.driver, timeout).until(
+            EC.visibility_of_element_located(
+                (
+                    By.CSS_SELECTOR,
+                    css_selector
+                )
+            )
+        )
+
     def wait_for_all_elements_to_load(self, by=By.CLASS_NAME, name="pv-top-card", base=None):
         base = base or self.driver
         return WebDriverWait(base, self.WAIT_FOR_ELEMENT_TIMEOUT).until(
@@ -101,6 +261,10 @@ class Scraper:
 
 
     def is_signed_in(self):
+        # only a positive answer is remembered, since the user may still log
+        # in on this driver after a scraper has been created with scrape=False
+        if getattr(self.driver, "_linkedin_signed_in", False):
+            return True
         try:
             WebDriverWait(self.driver, self.WAIT_FOR_ELEMENT_TIMEOUT).until(
                 EC.presence_of_element_located(
@@ -110,8 +274,7 @@ class Scraper:
                     )
                 )
             )
-
-            self.driver.find_element(By.CLASS_NAME, c.VERIFY_LOGIN_ID)
+            self.driver._linkedin_signed_in = True
             return True
         except Exception as e:
             pass
@@ -127,34 +290,53 @@ class Scraper:
             "window.scrollTo(0, document.body.scrollHeight);"
         )
 
+    def scroll_to_bottom_until_stable(self, pause_time=1, max_scrolls=5):
+        # keeps scrolling in the browser until the page stops growing, so it
+        # costs a single round-trip instead of a scroll + sleep per step
+        return self.driver.execute_async_script(
+            """
+            var pause = arguments[0], max = arguments[1];
+            var callback = arguments[arguments.length - 1];
+            var root = document.scrollingElement || document.documentElement;
+            var previous = -1, stable = 0, scrolls = 0;
+            (function step() {
+                var height = root.scrollHeight;
+                if (height === previous) {
+                    stable++;
+                } else {
+                    stable = 0;
+                    previous = height;
+                }
+                // lazy lists can take more than one tick to append, so only
+                // stop once the height has held for two checks in a row
+                if (stable >= 2 || scrolls >= max) {
+                    return callback(scrolls);
+                }
+                window.scrollTo(0, height);
+                scrolls++;
+                setTimeout(step, pause);
+            })();
+            """,
+            int(pause_time * 1000),
+            max_scrolls,
+        )
+
     def scroll_class_name_element_to_page_percent(self, class_name:str, page_percent:float):
         self.driver.execute_script(
             f'elem = document.getElementsByClassName("{class_name}")[0]; elem.scrollTo(0, elem.scrollHeight*{str(page_percent)});'
         )
 
+    # find_elements returns an empty list for a missing element, instead of
+    # raising NoSuchElementException with the driver's whole error payload
     def __find_element_by_class_name__(self, class_name):
-        try:
-            self.driver.find_element(By.CLASS_NAME, class_name)
-            return True
-        except:
-            pass
-        return False
+        return bool(self.driver.find_elements(By.CLASS_NAME, class_name))
 
     def __find_element_by_xpath__(self, tag_name):
-        try:
-            self.driver.find_element(By.XPATH,tag_name)
-            return True
-        except:
-            pass
-        return False
+        return bool(self.driver.find_elements(By.XPATH, tag_name))
 
     def __find_enabled_element_by_xpath__(self, tag_name):
-        try:
-            elem = self.driver.find_element(By.XPATH,tag_name)
-            return elem.is_enabled()
-        except:
-            pass
-        return False
+        elems = self.driver.find_elements(By.XPATH, tag_name)
+        return elems[0].is_enabled() if elems else False
 
     @classmethod
     def __find_first_available_element__(cls, *args):
@@ -1,18 +1,383 @@
-import requests
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException
-from .objects import Experience, Education, Scraper, Interest, Accomplishment, Contact
+from selenium.common.exceptions import TimeoutException
+from . import actions
+from .browser import create_driver, get_driver
+from .cache import DEFAULT_TTL, default_cache
+from .objects import Experience, Education, Scraper, Interest, Accomplishment, Contact, PersonData, http_session, outcome, raise_for_public_response
 import os
-from linkedin_scraper import selectors
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.util import Finalize
+import re
+from lxml import etree, html
+from .selectors import first_text, has_class
+
+# compiled once at import, since every profile runs the same handful of
+# selectors over its snapshot
+MAIN_LIST = etree.XPath(f"//main//*[{has_class('pvs-list__container')}]")
+NESTED_LIST = etree.XPath(f".//*[{has_class('pvs-list__container')}]")
+LIST_ITEMS = etree.XPath(f".//*[{has_class('pvs-list__paged-list-item')}]")
+# list items that aren't nested inside another item of the same list
+TOP_LEVEL_LIST_ITEMS = etree.XPath(
+    f".//*[{has_class('pvs-list__paged-list-item')}]"
+    f"[not(ancestor::*[{has_class('pvs-list__paged-list-item')}])]"
+)
+ENTITY = etree.XPath(".//div[@data-view-name='profile-component-entity']")
+CHILDREN = etree.XPath("*")
+DESCENDANTS = etree.XPath(".//*")
+# positional, so evaluation stops at the first match instead of collecting
+# every descendant that matches
+FIRST_SPAN = etree.XPath("(.//span)[1]")
+FIRST_LINK = etree.XPath("(.//a)[1]")
+AFTER_FIRST_LINK = etree.XPath("(.//a)[1]/../following-sibling::*")
+HEADING = etree.XPath(".//h3")
+INTERESTS_SECTION = etree.XPath(f"//*[{has_class('pv-interests-section')}]")
+INTEREST_ENTITY = etree.XPath(f".//*[{has_class('pv-interest-entity')}]")
+ACCOMPLISHMENTS_SECTION = etree.XPath(f"//*[{has_class('pv-accomplishments-section')}]")
+ACCOMPLISHMENT_BLOCK = etree.XPath(f".//div[{has_class('pv-accomplishments-block__content')}]")
+ACCOMPLISHMENT_TITLES = etree.XPath("(.//ul)[1]//li")
+DATE_RANGE = re.compile(r"^\s*(.+?)\s+[-\u2013]\s+(.+?)\s*$")
+# elements that start a new line of text; everything else is inline
+BLOCK_TAGS = frozenset([
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main",
+    "ol", "p", "pre", "section", "table", "tr", "ul",
+])
+
+# the public profile served to visitors who aren't logged in
+PUBLIC_NAME = etree.XPath(f"//h1[{has_class('top-card-layout__title')}]")
+PUBLIC_LOCATION = etree.XPath(f"(//*[{has_class('top-card-layout__first-subline')}]//span)[1]")
+PUBLIC_ABOUT = etree.XPath(f"//section[{has_class('summary')}]//*[{has_class('core-section-container__content')}]")
+PUBLIC_EXPERIENCES = etree.XPath(f"//section[@data-section='experience']//li[{has_class('experience-item')}]")
+PUBLIC_EDUCATIONS = etree.XPath(f"//section[@data-section='educationsDetails']//li[{has_class('education__list-item')}]")
+PUBLIC_ITEM_TITLE = etree.XPath(".//h3")
+PUBLIC_ITEM_SUBTITLE = etree.XPath(".//h4")
+PUBLIC_ITEM_LINK = etree.XPath("(.//a)[1]")
+PUBLIC_ITEM_DATES = etree.XPath(f".//*[{has_class('date-range')}]/time")
+PUBLIC_ITEM_DURATION = etree.XPath(f".//*[{has_class('date-range__duration')}]")
+PUBLIC_ITEM_LOCATION = etree.XPath(f".//*[{has_class('experience-item__location')}]")
+PUBLIC_ITEM_DESCRIPTION = etree.XPath(f".//*[{has_class('show-more-less-text__text--less')}]")
+PUBLIC_EDUCATION_DESCRIPTION = etree.XPath(f".//*[{has_class('education__item--details')}]")
+
+# selectors still run through selenium on the live page
+TOP_PANEL = ".mt2.relative"
+TOP_PANEL_LOCATION = ".text-body-small.inline.t-black--light.break-words"
+ABOUT = f"//*[@id='about']/..//*[{has_class('display-flex')}]"
+PROFILE_PICTURE = ".pv-top-card-profile-picture img"
+DETAILS_LIST = "main .pvs-list__container"
+DETAILS_EMPTY = "main .artdeco-empty-state"
+CONNECTIONS_URL = "https://www.linkedin.com/mynetwork/invite-connect/connections/"
+
+def _collect_text(elem, parts):
+    block = elem.tag in BLOCK_TAGS
+    if block:
+        parts.append("\n")
+    if elem.text:
+        parts.append(elem.text)
+    for child in elem:
+        # comments have no tag name, and linkedin repeats every label in a
+        # visually-hidden copy for screen readers
+        if isinstance(child.tag, str) and "visually-hidden" not in child.get("class", "").split():
+            _collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+    if block:
+        parts.append("\n")
+
+
+def _text(elem):
+    # rendered roughly the way innerText would be: inline markup stays on its
+    # line, and only block elements and <br> break it
+    parts = []
+    _collect_text(elem, parts)
+    lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _span_text(elem):
+    spans = FIRST_SPAN(elem)
+    return _text(spans[0]) if spans else ""
+
+
+def _split_dates(times):
+    # "Jan 2020 - Present", "2019 – 2021" or a lone "Jun 2016"
+    match = DATE_RANGE.match(times)
+    if match is None:
+        return times.strip(), ""
+    return match.group(1), match.group(2)
+
+
+def _public_dates(item):
+    dates = [" ".join(time.text_content().split()) for time in PUBLIC_ITEM_DATES(item)]
+    from_date = dates[0] if dates else None
+    to_date = dates[1] if len(dates) > 1 else None
+    return from_date, to_date
+
+
+def _parse_public_experiences(tree):
+    for item in PUBLIC_EXPERIENCES(tree):
+        links = PUBLIC_ITEM_LINK(item)
+        from_date, to_date = _public_dates(item)
+        # a position with only a start date is the current one
+        if from_date and not to_date:
+            to_date = "Present"
+        yield Experience(
+            position_title=first_text(item, PUBLIC_ITEM_TITLE),
+            from_date=from_date,
+            to_date=to_date,
+            duration=first_text(item, PUBLIC_ITEM_DURATION),
+            location=first_text(item, PUBLIC_ITEM_LOCATION),
+            description=first_text(item, PUBLIC_ITEM_DESCRIPTION),
+            institution_name=first_text(item, PUBLIC_ITEM_SUBTITLE),
+            linkedin_url=links[0].get("href") if links else None
+        )
+
+
+def _parse_public_educations(tree):
+    for item in PUBLIC_EDUCATIONS(tree):
+        links = PUBLIC_ITEM_LINK(item)
+        from_date, to_date = _public_dates(item)
+        yield Education(
+            from_date=from_date,
+            to_date=to_date,
+            description=first_text(item, PUBLIC_EDUCATION_DESCRIPTION),
+            degree=first_text(item, PUBLIC_ITEM_SUBTITLE),
+            institution_name=first_text(item, PUBLIC_ITEM_TITLE),
+            linkedin_url=links[0].get("href") if links else None
+        )
+
+
+def _experience(position_title, work_times, location, description, company, company_linkedin_url):
+    parts = work_times.split("·") if work_times else [""]
+    times = parts[0].strip()
+    duration = parts[1].strip() if len(parts) > 1 else None
+    from_date, to_date = _split_dates(times) if times else ("", "")
+    return Experience(
+        position_title=position_title,
+        from_date=from_date,
+        to_date=to_date,
+        duration=duration,
+        location=location,
+        description=description,
+        institution_name=company,
+        linkedin_url=company_linkedin_url
+    )
+
+
+def _parse_experiences(tree):
+    main_list = MAIN_LIST(tree)[0]
+    for position in TOP_LEVEL_LIST_ITEMS(main_list):
+        position = ENTITY(position)[0]
+        company_logo_elem, position_details = CHILDREN(position)
+
+        # company elem
+        company_linkedin_url = CHILDREN(company_logo_elem)[0].get("href")
+        if not company_linkedin_url:
+            continue
+
+        # position details
+        position_details_list = CHILDREN(position_details)
+        position_summary_details = position_details_list[0] if len(position_details_list) > 0 else None
+        position_summary_text = position_details_list[1] if len(position_details_list) > 1 else None
+        outer_positions = CHILDREN(CHILDREN(position_summary_details)[0])
+
+        if len(outer_positions) == 4:
+            position_title = _span_text(outer_positions[0])
+            company = _span_text(outer_positions[1])
+            work_times = _span_text(outer_positions[2])
+            location = _span_text(outer_positions[3])
+        elif len(outer_positions) == 3:
+            if "·" in outer_positions[2].text_content():
+                position_title = _span_text(outer_positions[0])
+                company = _span_text(outer_positions[1])
+                work_times = _span_text(outer_positions[2])
+                location = ""
+            else:
+                position_title = ""
+                company = _span_text(outer_positions[0])
+                work_times = _span_text(outer_positions[1])
+                location = _span_text(outer_positions[2])
+        else:
+            position_title = ""
+            company = _span_text(outer_positions[0])
+            work_times = ""
+            location = ""
+
+
+        inner_lists = NESTED_LIST(position_summary_text) if position_summary_text is not None else []
+        if inner_lists:
+            inner_positions = LIST_ITEMS(inner_lists[0])
+        else:
+            inner_positions = []
+        if len(inner_positions) > 1:
+            # several positions held at the same company
+            for description in inner_positions:
+                res = CHILDREN(FIRST_LINK(description)[0])
+                position_title_elem = res[0] if len(res) > 0 else None
+                work_times_elem = res[1] if len(res) > 1 else None
+                location_elem = res[2] if len(res) > 2 else None
+
+                yield _experience(
+                    position_title=_text(DESCENDANTS(CHILDREN(position_title_elem)[0])[0]) if position_title_elem is not None else "",
+                    work_times=_text(CHILDREN(work_times_elem)[0]) if work_times_elem is not None else "",
+                    location=_text(CHILDREN(location_elem)[0]) if location_elem is not None else None,
+                    description="\n".join(_text(elem) for elem in AFTER_FIRST_LINK(description)),
+                    company=company,
+                    company_linkedin_url=company_linkedin_url,
+                )
+        else:
+            yield _experience(
+                position_title=position_title,
+                work_times=work_times,
+                location=location,
+                description=_text(position_summary_text) if position_summary_text is not None else "",
+                company=company,
+                company_linkedin_url=company_linkedin_url,
+            )
+
+
+def _parse_educations(tree):
+    main_list = MAIN_LIST(tree)[0]
+    for position in TOP_LEVEL_LIST_ITEMS(main_list):
+        position = ENTITY(position)[0]
+        institution_logo_elem, position_details = CHILDREN(position)
+
+        # company elem
+        institution_linkedin_url = CHILDREN(institution_logo_elem)[0].get("href")
+
+        # position details
+        position_details_list = CHILDREN(position_details)
+        position_summary_details = position_details_list[0] if len(position_details_list) > 0 else None
+        position_summary_text = position_details_list[1] if len(position_details_list) > 1 else None
+        outer_positions = CHILDREN(CHILDREN(position_summary_details)[0])
+
+        institution_name = _span_text(outer_positions[0])
+        if len(outer_positions) > 1:
+            degree = _span_text(outer_positions[1])
+        else:
+            degree = None
+
+        from_date = None
+        to_date = None
+        if len(outer_positions) > 2:
+            times = _span_text(outer_positions[2])
+
+            if times != "":
+                # schools are listed by year, whether or not a month is shown
+                from_date, to_date = _split_dates(times)
+                from_date = from_date.split(" ")[-1]
+                to_date = (to_date or from_date).split(" ")[-1]
+
+
+
+        description = _text(position_summary_text) if position_summary_text is not None else ""
+
+        education = Education(
+            from_date=from_date,
+            to_date=to_date,
+            description=description,
+            degree=degree,
+            institution_name=institution_name,
+            linkedin_url=institution_linkedin_url
+        )
+        yield education
+
+
+def _parse_interests(tree):
+    for container in INTERESTS_SECTION(tree):
+        for interest_elem in INTEREST_ENTITY(container):
+            # one malformed entity shouldn't take the rest of the profile with it
+            headings = HEADING(interest_elem)
+            if not headings:
+                continue
+            yield Interest(title=_text(headings[0]))
+
+
+def _parse_accomplishments(tree):
+    for container in ACCOMPLISHMENTS_SECTION(tree):
+        for block in ACCOMPLISHMENT_BLOCK(container):
+            headings = HEADING(block)
+            if not headings:
+                continue
+            category = _text(headings[0])
+            for title in ACCOMPLISHMENT_TITLES(block):
+                yield Accomplishment(category=category, title=_text(title))
+
+
+# the logged-in browser owned by each worker process of Person.scrape_many
+_worker_driver = None
+
+
+def _init_worker_driver(email, password, cookie, headless):
+    global _worker_driver
+    _worker_driver = create_driver(headless=headless)
+    # pool workers leave through os._exit, which skips atexit hooks
+    Finalize(None, _worker_driver.quit, exitpriority=10)
+    actions.login(_worker_driver, email, password, cookie=cookie)
+
+
+def _scrape_in_worker(cls, linkedin_url):
+    return cls(linkedin_url, driver=_worker_driver, close_on_complete=False)
 
 
 class Person(Scraper):
 
     __TOP_CARD = "main"
-    __WAIT_FOR_ELEMENT_TIMEOUT = 5
+
+    _LOCATORS = {
+        "top_panel": (By.CSS_SELECTOR, TOP_PANEL),
+        "top_panel_name": (By.TAG_NAME, "h1"),
+        "top_panel_location": (By.CSS_SELECTOR, TOP_PANEL_LOCATION),
+        "about": (By.XPATH, ABOUT),
+        "profile_picture": (By.CSS_SELECTOR, PROFILE_PICTURE),
+    }
+
+    # the top card fields that get_name_and_location, is_open_to_work and
+    # get_about look up one by one, read in a single round-trip
+    EXTRACT_TOP_CARD_JS = """
+        function first(xpath) {
+            return document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+        var panel = document.querySelector(arguments[0]);
+        var location = panel ? panel.querySelector(arguments[1]) : null;
+        var name = panel ? panel.querySelector("h1") : null;
+        var about = first(arguments[2]);
+        var picture = document.querySelector(arguments[3]);
+        return {
+            name: name ? name.innerText : null,
+            location: location ? location.innerText : null,
+            about: about ? about.innerText : null,
+            open_to_work: !!picture && (picture.getAttribute("title") || "").indexOf("#OPEN_TO_WORK") !== -1
+        };
+    """
+
+    DUMP_SECTION_JS = """
+        var elem = document.querySelector(arguments[0]) || document.documentElement;
+        return [elem.outerHTML, location.href];
+    """
+
+    # reads every connection card in one round-trip instead of four lookups
+    # per card
+    EXTRACT_CONNECTIONS_JS = """
+        var connections = document.getElementsByClassName("mn-connections")[0];
+        if (!connections) {
+            return [];
+        }
+        function text(card, className) {
+            var elem = card.getElementsByClassName(className)[0];
+            return elem ? elem.innerText.trim() : null;
+        }
+        var cards = Array.prototype.slice.call(connections.getElementsByClassName("mn-connection-card"));
+        return cards.map(function (card) {
+            var anchor = card.getElementsByClassName("mn-connection-card__link")[0];
+            return {
+                name: text(card, "mn-connection-card__name"),
+                occupation: text(card, "mn-connection-card__occupation"),
+                url: anchor ? anchor.href : null
+            };
+        });
+    """
 
     def __init__(
         self,
@@ -34,26 +399,21 @@ class Person(Scraper):
     ):
         self.linkedin_url = linkedin_url
         self.name = name
-        self.about = about or []
-        self.experiences = experiences or []
-        self.educations = educations or []
-        self.interests = interests or []
-        self.accomplishments = accomplishments or []
+        self.about = [] if about is None else about
+        # copied so that add_* never appends to a list owned by the caller
+        self.experiences = [] if experiences is None else list(experiences)
+        self.educations = [] if educations is None else list(educations)
+        self.interests = [] if interests is None else list(interests)
+        self.accomplishments = [] if accomplishments is None else list(accomplishments)
         self.also_viewed_urls = []
-        self.contacts = contacts or []
+        self.contacts = [] if contacts is None else list(contacts)
+        self._tree = None
 
-        if driver is None:
-            try:
-                if os.getenv("CHROMEDRIVER") == None:
-                    driver_path = os.path.join(
-                        os.path.dirname(__file__), "drivers/chromedriver"
-                    )
-                else:
-                    driver_path = os.getenv("CHROMEDRIVER")
-
-                driver = webdriver.Chrome(driver_path)
-            except:
-                driver = webdriver.Chrome()
+        # without a page to load there's nothing to open a browser for, and
+        # scrape() falls back to the public profile over http
+        self._pooled_driver = driver is None and get
+        if self._pooled_driver:
+            driver = get_driver()
 
         if get:
             driver.get(linkedin_url)
@@ -85,14 +445,139 @@ class Person(Scraper):
         self.contacts.append(contact)
 
     def scrape(self, close_on_complete=True):
-        if self.is_signed_in():
+        if self.driver is not None and self.is_signed_in():
             self.scrape_logged_in(close_on_complete=close_on_complete)
         else:
-            print("you are not logged in!")
+            self.scrape_not_logged_in(close_on_complete=close_on_complete)
+
+    def scrape_not_logged_in(self, close_on_complete=True, session=None):
+        # public profiles are plain html, so a browser isn't needed to read them
+        session = session or http_session
+        response = session.get(self.linkedin_url, timeout=10)
+        raise_for_public_response(response)
+        tree = html.fromstring(response.content, base_url=response.url)
+        tree.make_links_absolute()
+        self._tree = tree
+
+        self.name = first_text(tree, PUBLIC_NAME)
+        self.location = first_text(tree, PUBLIC_LOCATION)
+        self.about = first_text(tree, PUBLIC_ABOUT)
+        for experience in _parse_public_experiences(tree):
+            self.add_experience(experience)
+        for education in _parse_public_educations(tree):
+            self.add_education(education)
+
+        if close_on_complete and self.driver is not None:
+            self.close_driver()
+
+    @classmethod
+    def from_cache_or_scrape(cls, linkedin_url, ttl=DEFAULT_TTL, cache=None, refresh=False, **kwargs):
+        # a profile scraped within ttl seconds is returned from the local
+        # cache without touching the browser; refresh=True always scrapes
+        # an unscraped Person would be served from the cache as if it were
+        # the profile for the whole ttl
+        if not kwargs.get("scrape", True):
+            raise ValueError("from_cache_or_scrape always scrapes; create a Person directly for scrape=False")
+        cache = cache or default_cache()
+        if not refresh:
+            person = cache.get(linkedin_url, ttl=ttl)
+            if person is not None:
+                return person
+        person = cls(linkedin_url, **kwargs)
+        cache.set(linkedin_url, person)
+        return person
+
+    def __getstate__(self):
+        # the driver and the parsed page can't be pickled, and neither is
+        # part of the scraped profile
+        state = self.__dict__.copy()
+        state["driver"] = None
+        state["_tree"] = None
+        state["_pooled_driver"] = False
+        return state
+
+    def to_data(self):
+        return PersonData(
+            linkedin_url=self.linkedin_url,
+            name=self.name,
+            about=self.about,
+            open_to_work=getattr(self, "open_to_work", None),
+            experiences=list(self.experiences),
+            educations=list(self.educations),
+            interests=list(self.interests),
+            accomplishments=list(self.accomplishments),
+            contacts=list(self.contacts),
+        )
+
+    def to_dict(self):
+        return self.to_data().to_dict()
+
+    @classmethod
+    def from_dict(cls, data):
+        data = data if isinstance(data, PersonData) else PersonData.from_dict(data)
+        person = cls(
+            linkedin_url=data.linkedin_url,
+            name=data.name,
+            about=data.about,
+            experiences=data.experiences,
+            educations=data.educations,
+            interests=data.interests,
+            accomplishments=data.accomplishments,
+            contacts=data.contacts,
+            get=False,
+            scrape=False,
+        )
+        person.open_to_work = data.open_to_work
+        return person
+
+    @classmethod
+    def scrape_many_not_logged_in(cls, linkedin_urls, max_workers=8, session=None):
+        # public profiles are bound by network latency, so they're fetched on
+        # a pool of threads sharing one keep-alive session
+        def scrape_person(linkedin_url):
+            person = cls(linkedin_url=linkedin_url, get=False, scrape=False)
+            person.scrape_not_logged_in(close_on_complete=False, session=session)
+            return person
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(scrape_person, url) for url in linkedin_urls]
+            return [outcome(future) for future in futures]
+
+    @classmethod
+    def scrape_many(cls, linkedin_urls, workers=4, email=None, password=None, cookie=None, headless=True):
+        # logged-in scrapes spend most of their time waiting on the browser,
+        # so each worker process logs in its own chrome once and reuses it.
+        # every worker is another browser logging in to the same account, so
+        # there are never more of them than cores or urls
+        linkedin_urls = list(linkedin_urls)
+        if not linkedin_urls:
+            return []
+        workers = min(workers, os.cpu_count() or 1, len(linkedin_urls))
+        # the workers can't prompt for a password, since their stdin is
+        # closed, so the credentials are settled here first
+        if cookie is None:
+            email, password = actions.get_credentials(email, password)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker_driver,
+            initargs=(email, password, cookie, headless),
+        ) as executor:
+            futures = [executor.submit(_scrape_in_worker, cls, url) for url in linkedin_urls]
+            return [outcome(future) for future in futures]
+
+    def _load_tree(self, selector="main"):
+        # one snapshot of the current page, which the _parse_* helpers read
+        # from without going back to the driver. only the part they read is
+        # serialized, leaving out the head and the inline json linkedin embeds
+        # for its own client, and the url comes back in the same round-trip
+        source, url = self.driver.execute_script(self.DUMP_SECTION_JS, selector)
+        self._tree = html.fromstring(source, base_url=url)
+        self._tree.make_links_absolute()
+        return self._tree
 
     def _click_see_more_by_class_name(self, class_name):
         try:
-            _ = WebDriverWait(self.driver, self.__WAIT_FOR_ELEMENT_TIMEOUT).until(
+            _ = WebDriverWait(self.driver, self.WAIT_FOR_ELEMENT_TIMEOUT).until(
                 EC.presence_of_element_located((By.CLASS_NAME, class_name))
             )
             div = self.driver.find_element(By.CLASS_NAME, class_name)
@@ -101,202 +586,84 @@ class Person(Scraper):
             pass
 
     def is_open_to_work(self):
-        try:
-            return "#OPEN_TO_WORK" in self.driver.find_element(By.CLASS_NAME,"pv-top-card-profile-picture").find_element(By.TAG_NAME,"img").get_attribute("title")
-        except:
+        pictures = self.driver.find_elements(*self._LOCATORS["profile_picture"])
+        return bool(pictures) and "#OPEN_TO_WORK" in (pictures[0].get_attribute("title") or "")
+
+    def _reveal_details_list(self):
+        # a section with nothing in it shows a placeholder instead of the list,
+        # so wait for whichever renders first and only wait on the list itself
+        # when it's there, instead of timing out on every sparse profile
+        self.wait_for_selector(f"{DETAILS_LIST}, {DETAILS_EMPTY}")
+        if not self.driver.find_elements(By.CSS_SELECTOR, DETAILS_LIST):
             return False
+        # scroll the list itself into view rather than guessing where it is
+        self.reveal_and_wait(DETAILS_LIST)
+        self.scroll_to_bottom()
+        return True
 
     def get_experiences(self):
-        url = os.path.join(self.linkedin_url, "details/experience")
+        url = f"{self.linkedin_url.rstrip('/')}/details/experience"
         self.driver.get(url)
         self.focus()
-        main = self.wait_for_element_to_load(by=By.TAG_NAME, name="main")
-        self.scroll_to_half()
-        self.scroll_to_bottom()
-        main_list = self.wait_for_element_to_load(name="pvs-list__container", base=main)
-        for position in main_list.find_elements(By.CLASS_NAME, "pvs-list__paged-list-item"):
-            position = position.find_element(By.CSS_SELECTOR, "div[data-view-name='profile-component-entity']")
-            company_logo_elem, position_details = position.find_elements(By.XPATH, "*")
-
-            # company elem
-            company_linkedin_url = company_logo_elem.find_element(By.XPATH,"*").get_attribute("href")
-            if not company_linkedin_url:
-                continue
-
-            # position details
-            position_details_list = position_details.find_elements(By.XPATH,"*")
-            position_summary_details = position_details_list[0] if len(position_details_list) > 0 else None
-            position_summary_text = position_details_list[1] if len(position_details_list) > 1 else None
-            outer_positions = position_summary_details.find_element(By.XPATH,"*").find_elements(By.XPATH,"*")
-
-            if len(outer_positions) == 4:
-                position_title = outer_positions[0].find_element(By.TAG_NAME,"span").text
-                company = outer_positions[1].find_element(By.TAG_NAME,"span").text
-                work_times = outer_positions[2].find_element(By.TAG_NAME,"span").text
-                location = outer_positions[3].find_element(By.TAG_NAME,"span").text
-            elif len(outer_positions) == 3:
-                if "·" in outer_positions[2].text:
-                    position_title = outer_positions[0].find_element(By.TAG_NAME,"span").text
-                    company = outer_positions[1].find_element(By.TAG_NAME,"span").text
-                    work_times = outer_positions[2].find_element(By.TAG_NAME,"span").text
-                    location = ""
-                else:
-                    position_title = ""
-                    company = outer_positions[0].find_element(By.TAG_NAME,"span").text
-                    work_times = outer_positions[1].find_element(By.TAG_NAME,"span").text
-                    location = outer_positions[2].find_element(By.TAG_NAME,"span").text
-            else:
-                position_title = ""
-                company = outer_positions[0].find_element(By.TAG_NAME,"span").text
-                work_times = ""
-                location = ""
-
+        if not self._reveal_details_list():
+            return
 
-            times = work_times.split("·")[0].strip() if work_times else ""
-            duration = work_times.split("·")[1].strip() if len(work_times.split("·")) > 1 else None
-
-            from_date = " ".join(times.split(" ")[:2]) if times else ""
-            to_date = " ".join(times.split(" ")[3:]) if times else ""
-            if position_summary_text and any(element.get_attribute("pvs-list__container") for element in position_summary_text.find_elements(By.TAG_NAME, "*")):
-                inner_positions = (position_summary_text.find_element(By.CLASS_NAME,"pvs-list__container")
-                                  .find_element(By.XPATH,"*").find_element(By.XPATH,"*").find_element(By.XPATH,"*")
-                                  .find_elements(By.CLASS_NAME,"pvs-list__paged-list-item"))
-            else:
-                inner_positions = []
-            if len(inner_positions) > 1:
-                descriptions = inner_positions
-                for description in descriptions:
-                    res = description.find_element(By.TAG_NAME,"a").find_elements(By.XPATH,"*")
-                    position_title_elem = res[0] if len(res) > 0 else None
-                    work_times_elem = res[1] if len(res) > 1 else None
-                    location_elem = res[2] if len(res) > 2 else None
-
-
-                    location = location_elem.find_element(By.XPATH,"*").text if location_elem else None
-                    position_title = position_title_elem.find_element(By.XPATH,"*").find_element(By.TAG_NAME,"*").text if position_title_elem else ""
-                    work_times = work_times_elem.find_element(By.XPATH,"*").text if work_times_elem else ""
-                    times = work_times.split("·")[0].strip() if work_times else ""
-                    duration = work_times.split("·")[1].strip() if len(work_times.split("·")) > 1 else None
-                    from_date = " ".join(times.split(" ")[:2]) if times else ""
-                    to_date = " ".join(times.split(" ")[3:]) if times else ""
-
-                    experience = Experience(
-                        position_title=position_title,
-                        from_date=from_date,
-                        to_date=to_date,
-                        duration=duration,
-                        location=location,
-                        description=description,
-                        institution_name=company,
-                        linkedin_url=company_linkedin_url
-                    )
-                    self.add_experience(experience)
-            else:
-                description = position_summary_text.text if position_summary_text else ""
-
-                experience = Experience(
-                    position_title=position_title,
-                    from_date=from_date,
-                    to_date=to_date,
-                    duration=duration,
-                    location=location,
-                    description=description,
-                    institution_name=company,
-                    linkedin_url=company_linkedin_url
-                )
-                self.add_experience(experience)
+        for experience in _parse_experiences(self._load_tree()):
+            self.add_experience(experience)
 
     def get_educations(self):
-        url = os.path.join(self.linkedin_url, "details/education")
+        url = f"{self.linkedin_url.rstrip('/')}/details/education"
         self.driver.get(url)
         self.focus()
-        main = self.wait_for_element_to_load(by=By.TAG_NAME, name="main")
-        self.scroll_to_half()
-        self.scroll_to_bottom()
-        main_list = self.wait_for_element_to_load(name="pvs-list__container", base=main)
-        for position in main_list.find_elements(By.CLASS_NAME,"pvs-list__paged-list-item"):
-            position = position.find_element(By.XPATH,"//div[@data-view-name='profile-component-entity']")
-            institution_logo_elem, position_details = position.find_elements(By.XPATH,"*")
-
-            # company elem
-            institution_linkedin_url = institution_logo_elem.find_element(By.XPATH,"*").get_attribute("href")
-
-            # position details
-            position_details_list = position_details.find_elements(By.XPATH,"*")
-            position_summary_details = position_details_list[0] if len(position_details_list) > 0 else None
-            position_summary_text = position_details_list[1] if len(position_details_list) > 1 else None
-            outer_positions = position_summary_details.find_element(By.XPATH,"*").find_elements(By.XPATH,"*")
-
-            institution_name = outer_positions[0].find_element(By.TAG_NAME,"span").text
-            if len(outer_positions) > 1:
-                degree = outer_positions[1].find_element(By.TAG_NAME,"span").text
-            else:
-                degree = None
+        if not self._reveal_details_list():
+            return
 
-            if len(outer_positions) > 2:
-                times = outer_positions[2].find_element(By.TAG_NAME,"span").text
-
-                if times != "":
-                    from_date = times.split(" ")[times.split(" ").index("-")-1] if len(times.split(" "))>3 else times.split(" ")[0]
-                    to_date = times.split(" ")[-1]
-            else:
-                from_date = None
-                to_date = None
-
-
-
-            description = position_summary_text.text if position_summary_text else ""
-
-            education = Education(
-                from_date=from_date,
-                to_date=to_date,
-                description=description,
-                degree=degree,
-                institution_name=institution_name,
-                linkedin_url=institution_linkedin_url
-            )
+        for education in _parse_educations(self._load_tree()):
             self.add_education(education)
 
     def get_name_and_location(self):
-        top_panel = self.driver.find_element(By.XPATH, "//*[@class='mt2 relative']")
-        self.name = top_panel.find_element(By.TAG_NAME, "h1").text
-        self.location = top_panel.find_element(By.XPATH, "//*[@class='text-body-small inline t-black--light break-words']").text
+        top_panel = self.driver.find_element(*self._LOCATORS["top_panel"])
+        self.name = top_panel.find_element(*self._LOCATORS["top_panel_name"]).get_dom_property("innerText")
+        self.location = top_panel.find_element(*self._LOCATORS["top_panel_location"]).get_dom_property("innerText")
+
+    def get_top_card(self):
+        top_card = self.driver.execute_script(self.EXTRACT_TOP_CARD_JS, TOP_PANEL, TOP_PANEL_LOCATION, ABOUT, PROFILE_PICTURE)
+        self.name = top_card["name"]
+        self.location = top_card["location"]
+        self.open_to_work = top_card["open_to_work"]
+        self.about = top_card["about"]
 
     def get_about(self):
-        try:
-            about = self.driver.find_element(By.ID,"about").find_element(By.XPATH,"..").find_element(By.CLASS_NAME,"display-flex").text
-        except NoSuchElementException :
-            about=None
-        self.about = about
+        abouts = self.driver.find_elements(*self._LOCATORS["about"])
+        self.about = abouts[0].get_dom_property("innerText") if abouts else None
 
     def scrape_logged_in(self, close_on_complete=True):
         driver = self.driver
         duration = None
 
-        root = WebDriverWait(driver, self.__WAIT_FOR_ELEMENT_TIMEOUT).until(
-            EC.presence_of_element_located(
-                (
-                    By.TAG_NAME,
-                    self.__TOP_CARD,
-                )
-            )
-        )
+        if not self.wait_for_selector(self.__TOP_CARD):
+            raise TimeoutException(f"{self.linkedin_url} did not load")
         self.focus()
-        self.wait(5)
+        # the top card renders after main, so wait for it rather than a fixed 5s
+        self.wait_for_selector(TOP_PANEL)
 
-        # get name and location
-        self.get_name_and_location()
+        # get name, location, open to work and about
+        self.get_top_card()
 
-        self.open_to_work = self.is_open_to_work()
+        # the rest of the profile page is read from one snapshot taken now,
+        # before the details pages navigate away, so it's only loaded once.
+        # the lower sections only render once scrolled to, so the page is
+        # scrolled until it stops growing first
+        self.scroll_to_bottom_until_stable(pause_time=0.5)
+        tree = self._load_tree()
 
-        # get about
-        self.get_about()
-        driver.execute_script(
-            "window.scrollTo(0, Math.ceil(document.body.scrollHeight/2));"
-        )
-        driver.execute_script(
-            "window.scrollTo(0, Math.ceil(document.body.scrollHeight/1.5));"
-        )
+        # get interest
+        for interest in _parse_interests(tree):
+            self.add_interest(interest)
+
+        # get accomplishment
+        for accomplishment in _parse_accomplishments(tree):
+            self.add_accomplishment(accomplishment)
 
         # get experience
         self.get_experiences()
@@ -304,78 +671,17 @@ class Person(Scraper):
         # get education
         self.get_educations()
 
-        driver.get(self.linkedin_url)
-
-        # get interest
-        try:
-
-            _ = WebDriverWait(driver, self.__WAIT_FOR_ELEMENT_TIMEOUT).until(
-                EC.presence_of_element_located(
-                    (
-                        By.XPATH,
-                        "//*[@class='pv-profile-section pv-interests-section artdeco-container-card artdeco-card ember-view']",
-                    )
-                )
-            )
-            interestContainer = driver.find_element(By.XPATH,
-                "//*[@class='pv-profile-section pv-interests-section artdeco-container-card artdeco-card ember-view']"
-            )
-            for interestElement in interestContainer.find_elements(By.XPATH,
-                "//*[@class='pv-interest-entity pv-profile-section__card-item ember-view']"
-            ):
-                interest = Interest(
-                    interestElement.find_element(By.TAG_NAME, "h3").text.strip()
-                )
-                self.add_interest(interest)
-        except:
-            pass
-
-        # get accomplishment
-        try:
-            _ = WebDriverWait(driver, self.__WAIT_FOR_ELEMENT_TIMEOUT).until(
-                EC.presence_of_element_located(
-                    (
-                        By.XPATH,
-                        "//*[@class='pv-profile-section pv-accomplishments-section artdeco-container-card artdeco-card ember-view']",
-                    )
-                )
-            )
-            acc = driver.find_element(By.XPATH,
-                "//*[@class='pv-profile-section pv-accomplishments-section artdeco-container-card artdeco-card ember-view']"
-            )
-            for block in acc.find_elements(By.XPATH,
-                "//div[@class='pv-accomplishments-block__content break-words']"
-            ):
-                category = block.find_element(By.TAG_NAME, "h3")
-                for title in block.find_element(By.TAG_NAME,
-                    "ul"
-                ).find_elements(By.TAG_NAME, "li"):
-                    accomplishment = Accomplishment(category.text, title.text)
-                    self.add_accomplishment(accomplishment)
-        except:
-            pass
-
         # get connections
         try:
-            driver.get("https://www.linkedin.com/mynetwork/invite-connect/connections/")
-            _ = WebDriverWait(driver, self.__WAIT_FOR_ELEMENT_TIMEOUT).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "mn-connections"))
-            )
-            connections = driver.find_element(By.CLASS_NAME, "mn-connections")
-            if connections is not None:
-                for conn in connections.find_elements(By.CLASS_NAME, "mn-connection-card"):
-                    anchor = conn.find_element(By.CLASS_NAME, "mn-connection-card__link")
-                    url = anchor.get_attribute("href")
-                    name = conn.find_element(By.CLASS_NAME, "mn-connection-card__details").find_element(By.CLASS_NAME, "mn-connection-card__name").text.strip()
-                    occupation = conn.find_element(By.CLASS_NAME, "mn-connection-card__details").find_element(By.CLASS_NAME, "mn-connection-card__occupation").text.strip()
-
-                    contact = Contact(name=name, occupation=occupation, url=url)
-                    self.add_contact(contact)
+            driver.get(CONNECTIONS_URL)
+            self.wait_for_selector(".mn-connections")
+            for row in driver.execute_script(self.EXTRACT_CONNECTIONS_JS):
+                self.add_contact(Contact(**row))
         except:
             connections = None
 
         if close_on_complete:
-            driver.quit()
+            self.close_driver()
 
     @property
     def company(self):
@@ -400,12 +706,12 @@ class Person(Scraper):
             return None
 
     def __repr__(self):
-        return "<Person {name}\n\nAbout\n{about}\n\nExperience\n{exp}\n\nEducation\n{edu}\n\nInterest\n{int}\n\nAccomplishments\n{acc}\n\nContacts\n{conn}>".format(
-            name=self.name,
-            about=self.about,
-            exp=self.experiences,
-            edu=self.educations,
-            int=self.interests,
-            acc=self.accomplishments,
-            conn=self.contacts,
+        return (
+            f"<Person {self.name}\n\n"
+            f"About\n{self.about}\n\n"
+            f"Experience\n{self.experiences}\n\n"
+            f"Education\n{self.educations}\n\n"
+            f"Interest\n{self.interests}\n\n"
+            f"Accomplishments\n{self.accomplishments}\n\n"
+            f"Contacts\n{self.contacts}>"
         )
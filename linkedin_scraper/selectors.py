@@ -1 +1,11 @@
 NAME = 'text-heading-xlarge'
+
+
+def has_class(class_name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+def first_text(tree, xpath):
+    # whitespace-collapsed text of the first match, for the public pages
+    elems = xpath(tree)
+    return " ".join(elems[0].text_content().split()) if elems else None